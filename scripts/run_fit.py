@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from data_loader import load_data
 from optimizer import fit_params
-from plotting import plot_fit, plot_residuals
+from plotting import plot_fit, plot_residuals, sample_curve
 from utils import save_params_json
 
 
@@ -67,6 +67,30 @@ def parse_args():
         default=10,
         help="Number of random restarts for optimization"
     )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for optimization restarts (default: 1)"
+    )
+    parser.add_argument(
+        "--local-method",
+        type=str,
+        choices=["L-BFGS-B", "trf"],
+        default="L-BFGS-B",
+        help="Local optimizer for restarts: L-BFGS-B on the L1 loss or trf least squares"
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help=("Evaluate distances in float32 during the search "
+              "(faster, L1 rescored in float64; requires numba)")
+    )
+    parser.add_argument(
+        "--force-de",
+        action="store_true",
+        help="Always run differential evolution, even when the restarts already fit closely"
+    )
     return parser.parse_args()
 
 
@@ -85,22 +109,27 @@ def main():
     logger.info(f"Number of samples: {args.n_samples}")
     logger.info(f"Random seed: {args.seed}")
     logger.info(f"Number of restarts: {args.n_restarts}")
+    logger.info(f"Local method: {args.local_method}")
     logger.info(f"Output directory: {args.output_dir}")
     logger.info("="*60)
     
     try:
         # Load data
         logger.info("Loading data...")
-        df = load_data(args.data)
-        logger.info(f"Loaded {len(df)} data points")
+        xy = load_data(args.data)
+        logger.info(f"Loaded {len(xy.x)} data points")
         
         # Run optimization
         logger.info("Running optimization...")
         result = fit_params(
-            df,
+            xy,
             n_samples=args.n_samples,
             n_restarts=args.n_restarts,
-            seed=args.seed
+            seed=args.seed,
+            n_jobs=args.n_jobs,
+            local_method=args.local_method,
+            float32=args.float32,
+            force_de=args.force_de
         )
         
         # Print results
@@ -123,8 +152,14 @@ def main():
         fit_plot_path = Path(args.output_dir) / 'fit_plot.png'
         residuals_plot_path = Path(args.output_dir) / 'residuals_plot.png'
         
-        plot_fit(df, result, output_path=str(fit_plot_path))
-        plot_residuals(df, result, n_samples=args.n_samples, output_path=str(residuals_plot_path))
+        # Evaluate the fitted curve once, at the fit's resolution so the mean
+        # residual is the reported L1, and share it between both plots
+        curve = sample_curve(result, args.n_samples)
+        plot_fit(xy, result, output_path=str(fit_plot_path), curve=curve)
+        plot_residuals(
+            xy, result, n_samples=args.n_samples,
+            output_path=str(residuals_plot_path), curve=curve
+        )
         
         logger.info("Pipeline completed successfully!")
         return 0
@@ -0,0 +1,38 @@
+"""
+Ahead-of-time build of the fused Numba loss kernels.
+
+Compiles the float64 kernels from loss_numba into the `loss_aot` extension
+module next to this file, so the fitting pipeline does not pay Numba's JIT
+compile time on its first run. Requires Numba at build time only:
+
+    python src/_loss_aot.py
+
+loss_numba picks up the extension automatically once it is built.
+"""
+
+from pathlib import Path
+from numba.pycc import CC
+from loss_numba import fused_l1, fused_l1_and_grad, fused_l1_batch
+
+cc = CC('loss_aot')
+cc.output_dir = str(Path(__file__).parent)
+
+
+@cc.export('fused_l1', 'f8(f8, f8, f8, f8[::1], f8[::1], f8[::1])')
+def _fused_l1(theta_rad, M, X, t, x_obs, y_obs):
+    return fused_l1(theta_rad, M, X, t, x_obs, y_obs)
+
+
+@cc.export('fused_l1_and_grad', 'UniTuple(f8, 4)(f8, f8, f8, f8[::1], f8[::1], f8[::1])')
+def _fused_l1_and_grad(theta_rad, M, X, t, x_obs, y_obs):
+    return fused_l1_and_grad(theta_rad, M, X, t, x_obs, y_obs)
+
+
+@cc.export('fused_l1_batch', 'f8[::1](f8[::1], f8[::1], f8[::1], f8[::1], f8[::1], f8[::1])')
+def _fused_l1_batch(theta_rad, M, X, t, x_obs, y_obs):
+    return fused_l1_batch(theta_rad, M, X, t, x_obs, y_obs)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built loss_aot in {cc.output_dir}")
@@ -2,12 +2,19 @@
 Data loading and preprocessing utilities.
 """
 
+import functools
 import pandas as pd
 import numpy as np
-from typing import Tuple
+from typing import NamedTuple, Tuple
 
 
-def load_data(path: str) -> pd.DataFrame:
+class XY(NamedTuple):
+    """Observed points as contiguous float64 coordinate arrays."""
+    x: np.ndarray
+    y: np.ndarray
+
+
+def load_data(path: str) -> XY:
     """
     Load xy data from CSV file and validate format.
     
@@ -15,7 +22,7 @@ def load_data(path: str) -> pd.DataFrame:
         path: Path to CSV file containing x,y columns
         
     Returns:
-        DataFrame with validated x,y data
+        XY of validated x,y data
         
     Raises:
         FileNotFoundError: If file does not exist
@@ -38,19 +45,28 @@ def load_data(path: str) -> pd.DataFrame:
     if df[['x', 'y']].isna().any().any():
         raise ValueError("Data contains NaN values")
     
-    return df[['x', 'y']]
+    return XY(
+        x=np.ascontiguousarray(df['x'].to_numpy(np.float64)),
+        y=np.ascontiguousarray(df['y'].to_numpy(np.float64))
+    )
 
 
+@functools.lru_cache(maxsize=8)
 def get_uniform_t_values(n: int, t_min: float = 6.0, t_max: float = 60.0) -> np.ndarray:
     """
     Generate uniform t values for sampling the parametric curve.
     
+    Results are memoized per (n, t_min, t_max) and shared between callers, so
+    the returned array is read-only; copy it before mutating.
+    
     Args:
         n: Number of uniform samples
         t_min: Minimum t value (default: 6.0)
         t_max: Maximum t value (default: 60.0)
         
     Returns:
-        Array of n uniformly spaced t values
+        Read-only C-contiguous float64 array of n uniformly spaced t values
     """
-    return np.linspace(t_min, t_max, n)
+    t = np.linspace(t_min, t_max, n, dtype=np.float64)
+    t.setflags(write=False)
+    return t
@@ -3,8 +3,14 @@ Loss function and evaluation metrics for parametric curve fitting.
 """
 
 import numpy as np
-from typing import Tuple
-from model import predict
+from typing import Optional, Tuple
+from scipy.spatial import cKDTree
+from model import predict, deg_to_rad
+from loss_numba import NUMBA_AVAILABLE, fused_l1_loss_and_grad, resolve_l1_and_grad_kernel
+
+# Size of the (n_obs x n_samples) distance matrix from which a KD-tree query
+# beats the dense broadcast
+KDTREE_MIN_PAIRS = 20_000
 
 
 def l1_loss(params: np.ndarray, t_samples: np.ndarray, x_obs: np.ndarray, y_obs: np.ndarray) -> float:
@@ -12,6 +18,8 @@ def l1_loss(params: np.ndarray, t_samples: np.ndarray, x_obs: np.ndarray, y_obs:
     Compute L1 loss (mean absolute error) between predicted and observed points.
     
     For each observed point, find the minimum distance to the predicted curve.
+    Distances are computed in float64 whatever the input dtype; the float32
+    search path uses the fused Numba kernels instead.
     
     Args:
         params: Array of [theta_deg, M, X]
@@ -27,18 +35,264 @@ def l1_loss(params: np.ndarray, t_samples: np.ndarray, x_obs: np.ndarray, y_obs:
     # Predict curve at many t samples for dense coverage
     x_pred, y_pred = predict(t_samples, theta_deg, M, X)
     
-    # For each observed point, find minimum distance to predicted curve
-    min_distances = []
-    for x_o, y_o in zip(x_obs, y_obs):
-        # Compute distances from this observed point to all predicted points
-        dists = np.sqrt((x_pred - x_o)**2 + (y_pred - y_o)**2)
-        # Take minimum distance
-        min_distances.append(np.min(dists))
+    return mean_min_distance(x_pred, y_pred, x_obs, y_obs)
+
+
+def l1_loss_vec(params: np.ndarray, t_samples: np.ndarray,
+                x_obs: np.ndarray, y_obs: np.ndarray) -> np.ndarray:
+    """
+    Compute the L1 loss for a whole population of parameter vectors.
+    
+    Suitable for scipy's differential_evolution(..., vectorized=True). The
+    curves of all members are predicted in one broadcast; small problems
+    reduce a single (P, n_obs, n_samples) distance tensor, larger ones fall
+    back to a per-member nearest-point query.
+    
+    Args:
+        params: Array of shape (3, P) with rows theta_deg, M, X
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        
+    Returns:
+        Array of P L1 distances
+    """
+    # Predicted curves for every member, shape (P, n_samples)
+    x_pred, y_pred = predict(t_samples, params[0][:, None], params[1][:, None], params[2][:, None])
+    
+    if len(x_obs) * len(t_samples) >= KDTREE_MIN_PAIRS:
+        return np.array([
+            mean_min_distance(x_pred[j], y_pred[j], x_obs, y_obs)
+            for j in range(x_pred.shape[0])
+        ])
+    
+    # Distance tensor of shape (P, n_obs, n_samples)
+    dx = x_pred[:, None, :] - x_obs[None, :, None]
+    dy = y_pred[:, None, :] - y_obs[None, :, None]
+    d2 = dx * dx + dy * dy
+    
+    return np.sqrt(d2.min(axis=2)).mean(axis=1)
+
+
+def min_distance_residuals(params: np.ndarray, t_samples: np.ndarray,
+                           x_obs: np.ndarray, y_obs: np.ndarray) -> np.ndarray:
+    """
+    Per-point residuals for nonlinear least-squares fitting.
+    
+    Args:
+        params: Array of [theta_deg, M, X]
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        
+    Returns:
+        Array of minimum distances from each observed point to the curve;
+        its mean is the L1 loss
+    """
+    theta_deg, M, X = params
+    x_pred, y_pred = predict(t_samples, theta_deg, M, X)
+    dist, _ = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
+    return dist
+
+
+def l1_loss_and_grad(
+    params: np.ndarray,
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray,
+    abs_t: Optional[np.ndarray] = None,
+    sin03t: Optional[np.ndarray] = None,
+    exp_term: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[np.ndarray] = None
+) -> Tuple[float, np.ndarray]:
+    """
+    Compute L1 loss and its analytical gradient with respect to params.
+    
+    The loss is differentiable almost everywhere: with the nearest curve
+    sample of each observed point held fixed, each term is a Euclidean
+    distance whose gradient follows from the chain rule through predict.
+    
+    Args:
+        params: Array of [theta_deg, M, X]
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        abs_t: Optional precomputed |t|
+        sin03t: Optional precomputed sin(0.3 * t)
+        exp_term: Optional precomputed exp(M * |t|) for this M
+        out: Optional (2, n_samples) buffer for the predicted curve
+        scratch: Optional (n_samples,) scratch buffer for predict
+        
+    Returns:
+        Tuple of (L1 distance, gradient with respect to [theta_deg, M, X])
+    """
+    theta_deg, M, X = params
+    
+    if abs_t is None:
+        abs_t = np.abs(t_samples)
+    if sin03t is None:
+        sin03t = np.sin(0.3 * t_samples)
+    if exp_term is None:
+        exp_term = np.exp(M * abs_t)
+    
+    x_pred, y_pred = predict(
+        t_samples, theta_deg, M, X,
+        sin03t=sin03t, exp_term=exp_term, out=out, scratch=scratch
+    )
+    
+    # Nearest curve sample for each observed point
+    dist, nearest = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
+    ex = x_pred[nearest] - x_obs
+    ey = y_pred[nearest] - y_obs
+    
+    # Unit vectors from observed point to curve (zero where they coincide)
+    inv_dist = np.divide(1.0, dist, out=np.zeros_like(dist), where=dist > 0)
+    ux = ex * inv_dist
+    uy = ey * inv_dist
+    
+    # Partial derivatives of x(t), y(t) at the nearest samples
+    theta_rad = deg_to_rad(theta_deg)
+    cos_theta = np.cos(theta_rad)
+    sin_theta = np.sin(theta_rad)
+    t_k = t_samples[nearest]
+    wave_k = exp_term[nearest] * sin03t[nearest]
+    
+    dx_dtheta = -t_k * sin_theta - wave_k * cos_theta
+    dy_dtheta = t_k * cos_theta - wave_k * sin_theta
+    dx_dM = -abs_t[nearest] * wave_k * sin_theta
+    dy_dM = abs_t[nearest] * wave_k * cos_theta
+    
+    grad = np.array([
+        np.mean(ux * dx_dtheta + uy * dy_dtheta) * np.pi / 180.0,
+        np.mean(ux * dx_dM + uy * dy_dM),
+        np.mean(ux)
+    ])
+    
+    return dist.mean(), grad
+
+
+def nearest_curve_points(x_pred: np.ndarray, y_pred: np.ndarray,
+                         x_obs: np.ndarray, y_obs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the nearest predicted point for each observed point.
+    
+    Large problems (at least KDTREE_MIN_PAIRS point pairs) are queried
+    through a KD-tree in O((n_obs + n_samples) log n_samples); smaller ones
+    use a single broadcast distance matrix, which is faster at small sizes.
+    
+    Args:
+        x_pred: Predicted x coordinates
+        y_pred: Predicted y coordinates
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        
+    Returns:
+        Tuple of (minimum distances, indices of nearest predicted points)
+    """
+    if len(x_obs) * len(x_pred) >= KDTREE_MIN_PAIRS:
+        tree = cKDTree(np.column_stack([x_pred, y_pred]))
+        # Single-threaded: queries take about a millisecond, less than
+        # starting query threads, and restarts may already run in a pool
+        dist, nearest = tree.query(np.column_stack([x_obs, y_obs]), k=1, workers=1)
+        return dist, nearest
+    
+    # Pairwise squared distances, shape (n_obs, n_samples). sqrt is monotonic,
+    # so it is deferred until after the min over curve samples.
+    dx = x_pred[None, :] - x_obs[:, None]
+    dy = y_pred[None, :] - y_obs[:, None]
+    d2 = dx * dx + dy * dy
+    nearest = d2.argmin(axis=1)
+    min_d2 = np.take_along_axis(d2, nearest[:, None], axis=1)[:, 0]
     
-    # Return mean of minimum distances
-    l1 = np.mean(min_distances)
+    return np.sqrt(min_d2), nearest
+
+
+class LossEval:
+    """
+    Stateful L1 objective and gradient for fixed t samples and observations.
+    
+    Uses the fused Numba kernel when available, choosing between the AOT and
+    JIT builds once. Otherwise terms depending only on t and the curve
+    buffers are set up once for the NumPy path, and exp(M * |t|) is reused
+    while M is unchanged. Optimizers call the instance directly without an
+    args tuple; state is read from slots, which is cheaper than closure cells
+    on this hot path. Pickling keeps only the input arrays, and the rest is
+    rebuilt in the receiving process.
+    """
+    
+    __slots__ = (
+        't', 'xo', 'yo', 'kernel',
+        'abs_t', 'sin03t', 'buf', 'scratch', 'last_M', 'exp_term'
+    )
+    
+    def __init__(self, t_samples: np.ndarray, x_obs: np.ndarray, y_obs: np.ndarray) -> None:
+        """
+        Args:
+            t_samples: Array of t values for dense curve sampling
+            x_obs: Observed x coordinates
+            y_obs: Observed y coordinates
+        """
+        self.kernel = None
+        if NUMBA_AVAILABLE:
+            self.kernel, (t_samples, x_obs, y_obs) = resolve_l1_and_grad_kernel(
+                t_samples, x_obs, y_obs
+            )
+        self.t = t_samples
+        self.xo = x_obs
+        self.yo = y_obs
+        if self.kernel is not None:
+            return
+        
+        self.abs_t = np.abs(t_samples)
+        self.sin03t = np.sin(0.3 * t_samples)
+        self.buf = np.empty((2, len(t_samples)))
+        self.scratch = np.empty(len(t_samples))
+        self.last_M = None
+        self.exp_term = None
+    
+    def __call__(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Args:
+            params: Array of [theta_deg, M, X]
+            
+        Returns:
+            Tuple of (L1 distance, gradient with respect to [theta_deg, M, X])
+        """
+        if self.kernel is not None:
+            return fused_l1_loss_and_grad(params, self.t, self.xo, self.yo, kernel=self.kernel)
+        
+        M = params[1]
+        if M != self.last_M:
+            self.last_M = M
+            self.exp_term = np.exp(M * self.abs_t)
+        return l1_loss_and_grad(
+            params, self.t, self.xo, self.yo,
+            abs_t=self.abs_t, sin03t=self.sin03t, exp_term=self.exp_term,
+            out=self.buf, scratch=self.scratch
+        )
+    
+    def __reduce__(self) -> Tuple[type, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Pickle only the inputs; kernels are not picklable and buffers are rebuilt."""
+        return type(self), (self.t, self.xo, self.yo)
+
+
+def mean_min_distance(x_pred: np.ndarray, y_pred: np.ndarray,
+                      x_obs: np.ndarray, y_obs: np.ndarray) -> float:
+    """
+    Mean distance from each observed point to its nearest predicted point.
     
-    return l1
+    Args:
+        x_pred: Predicted x coordinates
+        y_pred: Predicted y coordinates
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        
+    Returns:
+        Mean of minimum distances
+    """
+    dist, _ = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
+    return dist.mean()
 
 
 def compute_residuals(x_pred: np.ndarray, y_pred: np.ndarray, 
@@ -55,4 +309,4 @@ def compute_residuals(x_pred: np.ndarray, y_pred: np.ndarray,
     Returns:
         Array of residual distances
     """
-    return np.sqrt((x_pred - x_obs)**2 + (y_pred - y_obs)**2)
+    return np.hypot(x_pred - x_obs, y_pred - y_obs)
@@ -0,0 +1,326 @@
+"""
+Numba-compiled L1 loss kernel fusing curve prediction and distance reduction.
+
+Numba is an optional dependency. Kernels are JIT-compiled on first use, or
+loaded from the ahead-of-time `loss_aot` extension when it has been built
+(see _loss_aot.py), which removes the compile cost from the first fit. When
+neither is available NUMBA_AVAILABLE is False and callers should fall back to
+loss.l1_loss.
+"""
+
+import numpy as np
+from typing import Callable, Optional, Tuple
+from model import deg_to_rad
+
+try:
+    from numba import njit
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+try:
+    import loss_aot
+    AOT_AVAILABLE = True
+except ImportError:
+    AOT_AVAILABLE = False
+
+NUMBA_AVAILABLE = JIT_AVAILABLE or AOT_AVAILABLE
+
+# Initial running minimum, finite (fastmath assumes no infinities) and
+# representable in both float32 and float64
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# Observed points per tile in the distance kernels; coordinates and running
+# minima for 1024 points (24 KB) stay resident in a 32 KB L1 cache
+OBS_BLOCK = 1024
+
+
+if JIT_AVAILABLE:
+    @njit(fastmath=True, cache=True, parallel=False)
+    def fused_l1(theta_rad, M, X, t, x_obs, y_obs):
+        """
+        Mean minimum distance from observed points to the sampled curve.
+
+        Arrays must share a dtype, float64 or float32; the curve and distances
+        are computed in that precision.
+
+        Args:
+            theta_rad: Angle parameter in radians
+            M: Exponential parameter
+            X: X-offset parameter
+            t: C-contiguous array of t samples
+            x_obs: C-contiguous observed x coordinates
+            y_obs: C-contiguous observed y coordinates
+
+        Returns:
+            L1 distance
+        """
+        cos_t = np.cos(theta_rad)
+        sin_t = np.sin(theta_rad)
+        n_t = t.shape[0]
+        n_obs = x_obs.shape[0]
+
+        # Evaluate the curve once; the transcendental terms do not depend on
+        # the observed point, so they stay out of the inner loop
+        x_pred = np.empty_like(t)
+        y_pred = np.empty_like(t)
+        for k in range(n_t):
+            tk = t[k]
+            wave = np.exp(M * abs(tk)) * np.sin(0.3 * tk)
+            x_pred[k] = tk * cos_t - wave * sin_t + X
+            y_pred[k] = 42.0 + tk * sin_t + wave * cos_t
+
+        # Running minimum squared distance per observed point (sqrt deferred
+        # until after the min), tiled over observed points so each tile's
+        # coordinates and minima stay in L1 while the curve streams past.
+        # The inner loop is element-wise over the tile and vectorizes.
+        min_d2 = np.empty_like(x_obs)
+        min_d2[:] = FLOAT32_MAX
+        for i0 in range(0, n_obs, OBS_BLOCK):
+            i1 = min(i0 + OBS_BLOCK, n_obs)
+            min_tile = min_d2[i0:i1]
+            x_tile = x_obs[i0:i1]
+            y_tile = y_obs[i0:i1]
+            for k in range(n_t):
+                xk = x_pred[k]
+                yk = y_pred[k]
+                for i in range(i1 - i0):
+                    dx = xk - x_tile[i]
+                    dy = yk - y_tile[i]
+                    d2 = dx * dx + dy * dy
+                    # Select rather than builtin min() so LLVM vectorizes
+                    min_tile[i] = d2 if d2 < min_tile[i] else min_tile[i]
+
+        total = 0.0
+        for i in range(n_obs):
+            total += np.sqrt(min_d2[i])
+
+        return total / n_obs
+
+    @njit(fastmath=True, cache=True, parallel=False)
+    def fused_l1_batch(theta_rad, M, X, t, x_obs, y_obs):
+        """
+        L1 distance for each member of a parameter population.
+
+        Same as fused_l1 with theta_rad, M and X given as length-P arrays;
+        evaluating the whole population in one call avoids a Python call per
+        member.
+
+        Returns:
+            Array of P L1 distances
+        """
+        n_members = theta_rad.shape[0]
+        out = np.empty(n_members)
+        for j in range(n_members):
+            out[j] = fused_l1(theta_rad[j], M[j], X[j], t, x_obs, y_obs)
+        return out
+
+    @njit(fastmath=True, cache=True, parallel=False)
+    def fused_l1_and_grad(theta_rad, M, X, t, x_obs, y_obs):
+        """
+        L1 distance and its gradient with respect to (theta_rad, M, X).
+
+        Same arguments as fused_l1. The gradient holds the nearest curve
+        sample of each observed point fixed (see loss.l1_loss_and_grad).
+
+        Returns:
+            Tuple of (L1 distance, d/dtheta_rad, d/dM, d/dX)
+        """
+        cos_t = np.cos(theta_rad)
+        sin_t = np.sin(theta_rad)
+        n_t = t.shape[0]
+        n_obs = x_obs.shape[0]
+
+        x_pred = np.empty_like(t)
+        y_pred = np.empty_like(t)
+        wave = np.empty_like(t)
+        for k in range(n_t):
+            tk = t[k]
+            wave[k] = np.exp(M * abs(tk)) * np.sin(0.3 * tk)
+            x_pred[k] = tk * cos_t - wave[k] * sin_t + X
+            y_pred[k] = 42.0 + tk * sin_t + wave[k] * cos_t
+
+        # Running minimum and its curve index, tiled as in fused_l1
+        min_d2 = np.empty_like(x_obs)
+        min_d2[:] = FLOAT32_MAX
+        nearest = np.zeros(n_obs, dtype=np.int64)
+        for i0 in range(0, n_obs, OBS_BLOCK):
+            i1 = min(i0 + OBS_BLOCK, n_obs)
+            min_tile = min_d2[i0:i1]
+            nearest_tile = nearest[i0:i1]
+            x_tile = x_obs[i0:i1]
+            y_tile = y_obs[i0:i1]
+            for k in range(n_t):
+                xk = x_pred[k]
+                yk = y_pred[k]
+                for i in range(i1 - i0):
+                    dx = xk - x_tile[i]
+                    dy = yk - y_tile[i]
+                    d2 = dx * dx + dy * dy
+                    closer = d2 < min_tile[i]
+                    nearest_tile[i] = k if closer else nearest_tile[i]
+                    min_tile[i] = d2 if closer else min_tile[i]
+
+        total = 0.0
+        g_theta = 0.0
+        g_M = 0.0
+        g_X = 0.0
+        for i in range(n_obs):
+            dist = np.sqrt(min_d2[i])
+            total += dist
+            if dist > 0.0:
+                k = nearest[i]
+                ux = (x_pred[k] - x_obs[i]) / dist
+                uy = (y_pred[k] - y_obs[i]) / dist
+                tk = t[k]
+                wk = wave[k]
+                g_theta += ux * (-tk * sin_t - wk * cos_t) + uy * (tk * cos_t - wk * sin_t)
+                g_M += abs(tk) * wk * (uy * cos_t - ux * sin_t)
+                g_X += ux
+
+        return total / n_obs, g_theta / n_obs, g_M / n_obs, g_X / n_obs
+
+
+def _aot_arrays(
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Select the ahead-of-time kernels for a call.
+
+    The AOT kernels are compiled for float64 only; float32 inputs keep using
+    the JIT kernels when Numba is installed and are upcast otherwise.
+
+    Returns:
+        Float64 (t_samples, x_obs, y_obs) for the AOT kernels, or None to use
+        the JIT kernels
+    """
+    if not AOT_AVAILABLE:
+        return None
+    arrays = (t_samples, x_obs, y_obs)
+    if JIT_AVAILABLE and any(a.dtype != np.float64 for a in arrays):
+        return None
+    return tuple(np.ascontiguousarray(a, dtype=np.float64) for a in arrays)
+
+
+def fused_l1_loss(
+    params: np.ndarray,
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray
+) -> float:
+    """
+    Compute L1 loss with the fused Numba kernel.
+
+    Drop-in replacement for loss.l1_loss; requires NUMBA_AVAILABLE. Array
+    arguments must be C-contiguous and share a dtype (float64, or float32 for
+    faster, lower-precision distances) so every call reuses the same
+    compiled specialization.
+
+    Args:
+        params: Array of [theta_deg, M, X]
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+
+    Returns:
+        L1 distance (mean of minimum distances from observed points to curve)
+    """
+    theta_deg, M, X = params
+    args = (float(deg_to_rad(theta_deg)), float(M), float(X))
+    aot_arrays = _aot_arrays(t_samples, x_obs, y_obs)
+    if aot_arrays is not None:
+        return loss_aot.fused_l1(*args, *aot_arrays)
+    return fused_l1(*args, t_samples, x_obs, y_obs)
+
+
+def resolve_l1_and_grad_kernel(
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray
+) -> Tuple[Callable, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Choose between the AOT and JIT gradient kernels for fixed inputs.
+
+    Callers evaluating many parameter vectors on the same arrays (see
+    loss.LossEval) resolve the kernel once and pass it to
+    fused_l1_loss_and_grad together with the returned arrays.
+
+    Args:
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+
+    Returns:
+        Tuple of (kernel, (t_samples, x_obs, y_obs) prepared for it)
+    """
+    aot_arrays = _aot_arrays(t_samples, x_obs, y_obs)
+    if aot_arrays is not None:
+        return loss_aot.fused_l1_and_grad, aot_arrays
+    return fused_l1_and_grad, (t_samples, x_obs, y_obs)
+
+
+def fused_l1_loss_and_grad(
+    params: np.ndarray,
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray,
+    kernel: Optional[Callable] = None
+) -> Tuple[float, np.ndarray]:
+    """
+    Compute L1 loss and its gradient with the fused Numba kernel.
+
+    Drop-in replacement for loss.l1_loss_and_grad; requires NUMBA_AVAILABLE.
+
+    Args:
+        params: Array of [theta_deg, M, X]
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+        kernel: Optional kernel from resolve_l1_and_grad_kernel, called with
+            the arrays it returned
+
+    Returns:
+        Tuple of (L1 distance, gradient with respect to [theta_deg, M, X])
+    """
+    if kernel is None:
+        kernel, (t_samples, x_obs, y_obs) = resolve_l1_and_grad_kernel(t_samples, x_obs, y_obs)
+    
+    theta_deg, M, X = params
+    l1, g_theta, g_M, g_X = kernel(
+        float(deg_to_rad(theta_deg)), float(M), float(X), t_samples, x_obs, y_obs
+    )
+    return l1, np.array([g_theta * np.pi / 180.0, g_M, g_X])
+
+
+def fused_l1_loss_vec(
+    params: np.ndarray,
+    t_samples: np.ndarray,
+    x_obs: np.ndarray,
+    y_obs: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the L1 loss for a population with the fused Numba kernel.
+
+    Drop-in replacement for loss.l1_loss_vec; requires NUMBA_AVAILABLE.
+
+    Args:
+        params: Array of shape (3, P) with rows theta_deg, M, X
+        t_samples: Array of t values for dense curve sampling
+        x_obs: Observed x coordinates
+        y_obs: Observed y coordinates
+
+    Returns:
+        Array of P L1 distances
+    """
+    params = np.asarray(params, dtype=np.float64)
+    args = (
+        np.ascontiguousarray(deg_to_rad(params[0])),
+        np.ascontiguousarray(params[1]),
+        np.ascontiguousarray(params[2])
+    )
+    aot_arrays = _aot_arrays(t_samples, x_obs, y_obs)
+    if aot_arrays is not None:
+        return loss_aot.fused_l1_batch(*args, *aot_arrays)
+    return fused_l1_batch(*args, t_samples, x_obs, y_obs)
@@ -3,7 +3,7 @@ Parametric curve model implementation.
 """
 
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 def deg_to_rad(degrees: float) -> float:
@@ -16,7 +16,17 @@ def rad_to_deg(radians: float) -> float:
     return np.rad2deg(radians)
 
 
-def predict(t: np.ndarray, theta_deg: float, M: float, X: float) -> Tuple[np.ndarray, np.ndarray]:
+def predict(
+    t: np.ndarray,
+    theta_deg: float,
+    M: float,
+    X: float,
+    abs_t: Optional[np.ndarray] = None,
+    sin03t: Optional[np.ndarray] = None,
+    exp_term: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute parametric curve x(t), y(t) for given parameters.
     
@@ -29,21 +39,63 @@ def predict(t: np.ndarray, theta_deg: float, M: float, X: float) -> Tuple[np.nda
         theta_deg: Angle parameter in degrees (0 < θ < 50)
         M: Exponential parameter (-0.05 < M < 0.05)
         X: X-offset parameter (0 < X < 100)
+        abs_t: Optional precomputed |t|
+        sin03t: Optional precomputed sin(0.3 * t)
+        exp_term: Optional precomputed exp(M * |t|) for this M
+        out: Optional float64 buffer of shape (2, len(t)) receiving x and y
+            as contiguous rows; reuse it across calls to avoid allocations.
+            Requires array t and scalar parameters.
+        scratch: Optional float64 buffer of shape (len(t),) for intermediates
         
     Returns:
-        Tuple of (x, y) arrays
+        Tuple of (x, y) arrays (views into out when buffers are provided)
     """
     # Convert theta to radians
     theta_rad = deg_to_rad(theta_deg)
     
-    # Compute common terms
+    # Compute common terms. Terms depending only on t (and M) may be
+    # supplied by the caller.
     cos_theta = np.cos(theta_rad)
     sin_theta = np.sin(theta_rad)
-    exp_term = np.exp(M * np.abs(t))
-    sin_03t = np.sin(0.3 * t)
+    if sin03t is None:
+        sin03t = np.sin(0.3 * t)
+    if exp_term is None and abs_t is None:
+        abs_t = np.abs(t)
     
-    # Compute x(t) and y(t)
-    x = t * cos_theta - exp_term * sin_03t * sin_theta + X
-    y = 42 + t * sin_theta + exp_term * sin_03t * cos_theta
+    if out is None and scratch is None:
+        # Broadcasting expression form; accepts scalar t and array
+        # parameters that broadcast against t
+        if exp_term is None:
+            exp_term = np.exp(M * abs_t)
+        wave = exp_term * sin03t
+        x = t * cos_theta - wave * sin_theta + X
+        y = 42 + t * sin_theta + wave * cos_theta
+        return x, y
+    
+    if out is None:
+        out = np.empty((2,) + np.shape(t))
+    if scratch is None:
+        scratch = np.empty(np.shape(t))
+    x, y = out[0], out[1]
+    
+    # Oscillating term exp(M*|t|) * sin(0.3*t), built in scratch
+    wave = scratch
+    if exp_term is None:
+        np.multiply(abs_t, M, out=wave)
+        np.exp(wave, out=wave)
+        wave *= sin03t
+    else:
+        np.multiply(exp_term, sin03t, out=wave)
+    
+    # Compute x(t) and y(t) in place; y holds wave * sin(θ) temporarily
+    np.multiply(t, cos_theta, out=x)
+    np.multiply(wave, sin_theta, out=y)
+    x -= y
+    x += X
+    
+    np.multiply(t, sin_theta, out=y)
+    y += 42
+    wave *= cos_theta
+    y += wave
     
     return x, y
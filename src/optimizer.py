@@ -5,38 +5,120 @@ Parameter optimization using scipy.optimize with bounds enforcement.
 import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, Optional, Tuple
-from scipy.optimize import minimize, differential_evolution
-from loss import l1_loss
-from data_loader import get_uniform_t_values
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from scipy.optimize import minimize, differential_evolution, least_squares
+from scipy.stats import qmc
+from loss import LossEval, l1_loss_vec, min_distance_residuals
+from loss_numba import JIT_AVAILABLE, NUMBA_AVAILABLE, fused_l1_loss, fused_l1_loss_vec
+from data_loader import XY, get_uniform_t_values
 from utils import validate_bounds
 
 logger = logging.getLogger(__name__)
 
+# Local optimizers available for the multi-start restarts
+LOCAL_METHODS = ('L-BFGS-B', 'trf')
+
+# Differential evolution is skipped when the best restart L1 is below this
+# fraction of the observed y range
+DE_SKIP_REL_TOL = 1e-3
+
+
+def _one_restart(
+    x0: np.ndarray,
+    loss_eval: LossEval,
+    bounds: List[Tuple[float, float]],
+    local_method: str = 'L-BFGS-B'
+) -> Tuple[float, np.ndarray]:
+    """
+    Run a single local optimization restart.
+    
+    'L-BFGS-B' minimizes the L1 loss directly using its analytical gradient.
+    'trf' solves the nonlinear least-squares problem on per-point distances
+    with a trust-region reflective method, which typically converges in a
+    few dozen evaluations but optimizes the sum of squared distances.
+    
+    Defined at module level so it can be submitted to a process pool.
+    
+    Args:
+        x0: Initial [theta_deg, M, X]
+        loss_eval: Objective holding the t samples and observations
+        bounds: Parameter bounds in scipy format
+        local_method: One of LOCAL_METHODS
+        
+    Returns:
+        Tuple of (L1 loss, best-fit parameters)
+    """
+    if local_method == 'trf':
+        lower, upper = np.array(bounds).T
+        result = least_squares(
+            min_distance_residuals,
+            x0,
+            args=(loss_eval.t, loss_eval.xo, loss_eval.yo),
+            bounds=(lower, upper),
+            method='trf',
+            # M spans a range ~1000x narrower than theta and X; without
+            # rescaling the trust region is degenerate
+            x_scale=(upper - lower) / 10.0
+        )
+        return float(result.fun.mean()), result.x
+    
+    # Optimize using L-BFGS-B; the analytical gradient needs far fewer
+    # evaluations than derivative-free Nelder-Mead
+    result = minimize(
+        loss_eval,
+        x0,
+        jac=True,
+        method='L-BFGS-B',
+        bounds=bounds,
+        options={'maxiter': 10000}
+    )
+    
+    return float(result.fun), result.x
+
 
 def fit_params(
-    xy_df: pd.DataFrame,
+    xy: Union[XY, pd.DataFrame],
     initial_guess: Optional[Dict[str, float]] = None,
     n_samples: int = 100,
     bounds: Optional[Dict[str, Tuple[float, float]]] = None,
     n_restarts: int = 10,
-    seed: int = 42
+    seed: int = 42,
+    n_jobs: int = 1,
+    local_method: str = 'L-BFGS-B',
+    float32: bool = False,
+    force_de: bool = False
 ) -> Dict[str, float]:
     """
     Fit parametric curve parameters to observed data.
     
     Args:
-        xy_df: DataFrame with x,y columns
+        xy: Observed points as XY (from load_data) or a DataFrame with x,y
+            columns
         initial_guess: Optional initial parameter guess
         n_samples: Number of uniform t samples
         bounds: Optional parameter bounds
         n_restarts: Number of random restarts
         seed: Random seed for reproducibility
+        n_jobs: Number of worker processes for restarts (default: 1). A
+            restart takes milliseconds, so a pool only pays off for large
+            inputs or many restarts
+        local_method: Local optimizer for restarts, one of LOCAL_METHODS
+        float32: Evaluate distances on float32 data during the search, halving
+            memory traffic; the reported L1 is recomputed in float64. Requires
+            Numba (the NumPy fallback computes in float64) and is ignored with
+            a warning otherwise
+        force_de: Always run differential evolution, even when the restarts
+            already fit within DE_SKIP_REL_TOL of the y range
         
     Returns:
         Dictionary with best-fit parameters and L1 score
+        
+    Raises:
+        ValueError: If local_method is not supported
     """
-    np.random.seed(seed)
+    if local_method not in LOCAL_METHODS:
+        raise ValueError(f"Unknown local method: {local_method} (expected one of {LOCAL_METHODS})")
     
     # Default bounds
     if bounds is None:
@@ -46,13 +128,24 @@ def fit_params(
             'X': (0.1, 99.9)
         }
     
-    # Extract observed data
-    x_obs = xy_df['x'].values
-    y_obs = xy_df['y'].values
+    # Extract observed data once as C-contiguous float64; the fused kernels
+    # need contiguous inputs sharing one dtype
+    x_obs = np.ascontiguousarray(xy.x, dtype=np.float64)
+    y_obs = np.ascontiguousarray(xy.y, dtype=np.float64)
     
     # Generate uniform t samples
     t_samples = get_uniform_t_values(n_samples)
     
+    # Full-precision copies for scoring the final parameters
+    x_obs64, y_obs64, t_samples64 = x_obs, y_obs, t_samples
+    if float32 and not JIT_AVAILABLE:
+        logger.warning("float32 requires Numba; evaluating distances in float64")
+        float32 = False
+    if float32:
+        x_obs = x_obs.astype(np.float32)
+        y_obs = y_obs.astype(np.float32)
+        t_samples = t_samples.astype(np.float32)
+    
     # Define bounds for scipy
     scipy_bounds = [
         bounds['theta_deg'],
@@ -68,62 +161,98 @@ def fit_params(
             'X': 50.0
         }
     
-    best_result = None
+    best_x = None
     best_loss = float('inf')
     
     logger.info(f"Starting optimization with {n_restarts} restarts")
     
-    # Try multiple random restarts
-    for i in range(n_restarts):
-        if i == 0:
-            # First iteration: use provided initial guess
-            x0 = np.array([
-                initial_guess['theta_deg'],
-                initial_guess['M'],
-                initial_guess['X']
-            ])
+    # Draw all starting points up front so results do not depend on n_jobs.
+    # The first uses the provided initial guess; the rest come from a
+    # scrambled Halton sequence, which covers the bounds far more evenly
+    # than independent uniform draws.
+    lower, upper = np.array(scipy_bounds).T
+    starts = [np.array([
+        initial_guess['theta_deg'],
+        initial_guess['M'],
+        initial_guess['X']
+    ])]
+    if n_restarts > 1:
+        sampler = qmc.Halton(d=3, seed=seed)
+        starts.extend(qmc.scale(sampler.random(n_restarts - 1), lower, upper))
+    starts = starts[:n_restarts]
+    
+    # Restarts are independent, so run them in parallel when requested
+    loss_eval = LossEval(t_samples, x_obs, y_obs)
+    restart_args = (loss_eval, scipy_bounds, local_method)
+    if n_jobs > 1 and n_restarts > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, n_restarts)) as executor:
+            futures = [executor.submit(_one_restart, x0, *restart_args) for x0 in starts]
+            restart_results = [future.result() for future in futures]
+    else:
+        restart_results = [_one_restart(x0, *restart_args) for x0 in starts]
+    
+    for i, (fun, x) in enumerate(restart_results):
+        if fun < best_loss:
+            best_loss = fun
+            best_x = x
+            logger.info(f"Restart {i+1}/{n_restarts}: New best L1 = {best_loss:.6f}")
+    
+    # Differential evolution is far more expensive than a restart; skip it
+    # when the restarts already fit the data closely
+    de_threshold = DE_SKIP_REL_TOL * (y_obs.max() - y_obs.min())
+    if force_de or best_loss > de_threshold:
+        # Also try differential evolution for global optimization, seeding
+        # its population with the restart optima plus Gaussian perturbations
+        # scaled to each parameter's range so it starts inside good basins
+        logger.info("Running differential evolution for global search")
+        de_popsize = 15
+        if restart_results:
+            restart_x = np.array([x for _, x in restart_results])
+            pop_size = de_popsize * len(scipy_bounds)
+            rng = np.random.default_rng(seed)
+            centers = restart_x[np.arange(pop_size - len(restart_x)) % len(restart_x)]
+            noise = rng.normal(scale=0.05 * (upper - lower), size=centers.shape)
+            de_init = np.clip(np.vstack([restart_x, centers + noise]), lower, upper)
         else:
-            # Random initialization within bounds
-            x0 = np.array([
-                np.random.uniform(*bounds['theta_deg']),
-                np.random.uniform(*bounds['M']),
-                np.random.uniform(*bounds['X'])
-            ])
+            de_init = 'latinhypercube'
         
-        # Optimize using Nelder-Mead (robust to local minima)
-        result = minimize(
-            l1_loss,
-            x0,
+        # The whole population is evaluated in one call per generation
+        de_loss = fused_l1_loss_vec if NUMBA_AVAILABLE else l1_loss_vec
+        de_result = differential_evolution(
+            de_loss,
+            scipy_bounds,
             args=(t_samples, x_obs, y_obs),
-            method='Nelder-Mead',
-            bounds=scipy_bounds,
-            options={'maxiter': 10000, 'xatol': 1e-6, 'fatol': 1e-6}
+            seed=seed,
+            maxiter=1000,
+            atol=1e-6,
+            tol=1e-6,
+            updating='deferred',
+            vectorized=True,
+            polish=False,
+            popsize=de_popsize,
+            init=de_init
         )
         
-        if result.fun < best_loss:
-            best_loss = result.fun
-            best_result = result
-            logger.info(f"Restart {i+1}/{n_restarts}: New best L1 = {best_loss:.6f}")
-    
-    # Also try differential evolution for global optimization
-    logger.info("Running differential evolution for global search")
-    de_result = differential_evolution(
-        l1_loss,
-        scipy_bounds,
-        args=(t_samples, x_obs, y_obs),
-        seed=seed,
-        maxiter=1000,
-        atol=1e-6,
-        tol=1e-6
-    )
+        # Polish with L-BFGS-B using the analytical gradient rather than
+        # SciPy's built-in polish, which differentiates the loss numerically
+        de_loss_value, de_x = _one_restart(de_result.x, loss_eval, scipy_bounds)
+        if de_result.fun < de_loss_value:
+            de_loss_value, de_x = float(de_result.fun), de_result.x
+        
+        if de_loss_value < best_loss:
+            best_loss = de_loss_value
+            best_x = de_x
+            logger.info(f"Differential evolution: New best L1 = {best_loss:.6f}")
+    else:
+        logger.info(
+            f"Skipping differential evolution: best L1 {best_loss:.6f} <= {de_threshold:.6f}"
+        )
     
-    if de_result.fun < best_loss:
-        best_loss = de_result.fun
-        best_result = de_result
-        logger.info(f"Differential evolution: New best L1 = {best_loss:.6f}")
+    if float32:
+        best_loss = fused_l1_loss(best_x, t_samples64, x_obs64, y_obs64)
     
     # Extract best parameters
-    theta_deg, M, X = best_result.x
+    theta_deg, M, X = best_x
     
     # Validate bounds
     if not validate_bounds(theta_deg, M, X):
@@ -4,38 +4,65 @@ Plotting utilities for visualization and saving results.
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, Union
 from model import predict
-from loss import compute_residuals
-from data_loader import get_uniform_t_values
+from loss import nearest_curve_points
+from data_loader import XY, get_uniform_t_values
+
+
+def sample_curve(params: dict, n_points: int = 500) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the fitted parametric curve at uniform t values.
+    
+    The result can be passed as `curve` to plot_fit or plot_residuals; for
+    residuals, sample at the n_samples used for fitting so their mean equals
+    the fitted L1 loss.
+    
+    Args:
+        params: Dictionary with theta_deg, M, X parameters
+        n_points: Number of curve points
+        
+    Returns:
+        Tuple of (x, y) arrays
+    """
+    t_curve = get_uniform_t_values(n_points)
+    return predict(t_curve, params['theta_deg'], params['M'], params['X'])
 
 
 def plot_fit(
-    xy_df: pd.DataFrame,
+    xy: Union[XY, pd.DataFrame],
     params: dict,
     n_curve_points: int = 500,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    curve: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    dpi: int = 150
 ) -> None:
     """
     Plot observed data points and fitted parametric curve.
     
     Args:
-        xy_df: DataFrame with observed x,y data
+        xy: Observed points as XY or a DataFrame with x,y columns
         params: Dictionary with theta_deg, M, X parameters
         n_curve_points: Number of points for smooth curve
         output_path: Optional path to save figure
+        curve: Optional precomputed (x, y) curve from sample_curve
+        dpi: Resolution of the saved figure
     """
     # Generate smooth curve
-    t_curve = get_uniform_t_values(n_curve_points)
-    x_curve, y_curve = predict(t_curve, params['theta_deg'], params['M'], params['X'])
+    if curve is None:
+        curve = sample_curve(params, n_curve_points)
+    x_curve, y_curve = curve
     
-    # Create figure
-    fig, ax = plt.subplots(figsize=(10, 8))
+    # Create figure; a bare Figure renders with Agg and skips pyplot's
+    # backend and figure-manager setup
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
     
-    # Plot observed points
-    ax.scatter(xy_df['x'], xy_df['y'], alpha=0.5, s=20, label='Observed Data', color='blue')
+    # Plot observed points (rasterized; the curve stays vector)
+    ax.scatter(xy.x, xy.y, alpha=0.5, s=20, label='Observed Data', color='blue',
+               rasterized=True)
     
     # Plot fitted curve
     ax.plot(x_curve, y_curve, 'r-', linewidth=2, label='Fitted Curve', alpha=0.8)
@@ -47,48 +74,57 @@ def plot_fit(
     ax.legend(fontsize=10)
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save if path provided
     if output_path:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=dpi, bbox_inches='tight')
         print(f"Saved fit plot to {output_path}")
-    
-    plt.close()
 
 
 def plot_residuals(
-    xy_df: pd.DataFrame,
+    xy: Union[XY, pd.DataFrame],
     params: dict,
     n_samples: int = 200,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    curve: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    dpi: int = 150
 ) -> None:
     """
-    Plot residuals between observed and predicted points.
+    Plot residuals between observed points and the fitted curve.
+    
+    Each residual is the distance from an observed point to its nearest
+    point on the sampled curve; with n_samples equal to the value used for
+    fitting, their mean is the fitted L1 loss.
     
     Args:
-        xy_df: DataFrame with observed x,y data
+        xy: Observed points as XY or a DataFrame with x,y columns
         params: Dictionary with theta_deg, M, X parameters
-        n_samples: Number of samples for residual computation
+        n_samples: Number of curve samples for residual computation
         output_path: Optional path to save figure
+        curve: Optional precomputed (x, y) curve from sample_curve, sampled
+            at n_samples points
+        dpi: Resolution of the saved figure
     """
     # Generate predictions at uniform t samples
-    t_samples = get_uniform_t_values(n_samples)
-    x_pred, y_pred = predict(t_samples, params['theta_deg'], params['M'], params['X'])
+    if curve is None:
+        curve = sample_curve(params, n_samples)
+    x_pred, y_pred = curve
     
-    # Compute residuals (assuming order matches)
-    x_obs = xy_df['x'].values[:n_samples]
-    y_obs = xy_df['y'].values[:n_samples]
+    # Nearest-curve residual for every observed point
+    x_obs = np.asarray(xy.x, dtype=np.float64)
+    y_obs = np.asarray(xy.y, dtype=np.float64)
     
-    residuals = compute_residuals(x_pred[:len(x_obs)], y_pred[:len(y_obs)], x_obs, y_obs)
+    residuals, _ = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
     
     # Create figure with two subplots
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    fig = Figure(figsize=(14, 5))
+    ax1, ax2 = fig.subplots(1, 2)
     
-    # Residuals vs index
-    ax1.plot(residuals, 'o-', alpha=0.6, markersize=4)
+    # Residuals vs index (one marker per observed point, rasterized)
+    ax1.plot(residuals, 'o-', alpha=0.6, markersize=4, rasterized=True)
     ax1.set_xlabel('Data Point Index', fontsize=12)
     ax1.set_ylabel('Residual Distance', fontsize=12)
     ax1.set_title('Residuals vs Data Point', fontsize=14, fontweight='bold')
@@ -103,13 +139,11 @@ def plot_residuals(
     ax2.legend(fontsize=10)
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save if path provided
     if output_path:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=dpi, bbox_inches='tight')
         print(f"Saved residuals plot to {output_path}")
-    
-    plt.close()
@@ -5,9 +5,15 @@ Pytest configuration and fixtures.
 import pytest
 import numpy as np
 import pandas as pd
+import sys
 import tempfile
 from pathlib import Path
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_loader import get_uniform_t_values
+
 
 @pytest.fixture
 def temp_dir():
@@ -34,3 +40,13 @@ def known_params():
         'M': 0.01,
         'X': 50.0
     }
+
+
+@pytest.fixture
+def loss_args(sample_data, known_params):
+    """Known parameters, 80 uniform t samples and sample_data as loss arguments."""
+    params = np.array([known_params['theta_deg'], known_params['M'], known_params['X']])
+    t_samples = get_uniform_t_values(80)
+    x_obs = sample_data['x'].to_numpy()
+    y_obs = sample_data['y'].to_numpy()
+    return params, t_samples, x_obs, y_obs
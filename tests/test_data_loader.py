@@ -0,0 +1,48 @@
+"""
+Unit tests for data loading utilities.
+"""
+
+import numpy as np
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from data_loader import XY, load_data, get_uniform_t_values
+
+
+def test_load_data_returns_float64_arrays(temp_dir, sample_data):
+    """Test that load_data returns contiguous float64 coordinate arrays."""
+    path = temp_dir / 'xy.csv'
+    sample_data.to_csv(path, index=False)
+    
+    xy = load_data(str(path))
+    
+    assert isinstance(xy, XY)
+    for values, column in ((xy.x, 'x'), (xy.y, 'y')):
+        assert values.dtype == np.float64
+        assert values.flags.c_contiguous
+        assert np.allclose(values, sample_data[column])
+
+
+def test_load_data_missing_columns(temp_dir, sample_data):
+    """Test that CSVs without x,y columns are rejected."""
+    path = temp_dir / 'bad.csv'
+    sample_data.rename(columns={'y': 'z'}).to_csv(path, index=False)
+    
+    with pytest.raises(ValueError):
+        load_data(str(path))
+
+
+def test_uniform_t_values_memoized_read_only():
+    """Test that t samples are cached, read-only float64 arrays."""
+    t = get_uniform_t_values(25)
+    
+    assert t is get_uniform_t_values(25)
+    assert t.dtype == np.float64
+    assert t[0] == 6.0 and t[-1] == 60.0
+    assert not t.flags.writeable
+    with pytest.raises(ValueError):
+        t[0] = 0.0
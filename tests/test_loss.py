@@ -0,0 +1,189 @@
+"""
+Unit tests for loss functions.
+"""
+
+import numpy as np
+import pickle
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from model import predict
+from loss import (
+    KDTREE_MIN_PAIRS, LossEval, compute_residuals, l1_loss, l1_loss_and_grad, l1_loss_vec,
+    nearest_curve_points
+)
+from loss_numba import (
+    AOT_AVAILABLE, NUMBA_AVAILABLE, OBS_BLOCK, fused_l1_loss, fused_l1_loss_and_grad,
+    fused_l1_loss_vec
+)
+from data_loader import get_uniform_t_values
+
+
+def test_l1_loss_matches_pointwise_minimum(loss_args):
+    """Test vectorized L1 loss against a per-point reference computation."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    x_pred, y_pred = predict(t_samples, *params)
+    expected = np.mean([
+        np.min(np.sqrt((x_pred - x_o)**2 + (y_pred - y_o)**2))
+        for x_o, y_o in zip(x_obs, y_obs)
+    ])
+    
+    assert np.isclose(l1_loss(params, t_samples, x_obs, y_obs), expected)
+
+
+def test_l1_loss_zero_on_curve(known_params):
+    """Test that points sampled from the curve itself have zero loss."""
+    t_samples = get_uniform_t_values(50)
+    params = np.array([known_params['theta_deg'], known_params['M'], known_params['X']])
+    x_obs, y_obs = predict(t_samples, *params)
+    
+    assert np.isclose(l1_loss(params, t_samples, x_obs, y_obs), 0.0)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba not installed")
+def test_fused_l1_loss_matches_numpy(loss_args):
+    """Test that the Numba kernel agrees with the NumPy loss."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    expected = l1_loss(params, t_samples, x_obs, y_obs)
+    assert np.isclose(fused_l1_loss(params, t_samples, x_obs, y_obs), expected)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba not installed")
+@pytest.mark.parametrize("n_obs", [OBS_BLOCK - 1, OBS_BLOCK, OBS_BLOCK + 1, 2 * OBS_BLOCK + 452])
+def test_fused_kernels_match_numpy_across_tiles(n_obs, loss_args):
+    """Test the tiled Numba kernels on inputs crossing observation-tile boundaries."""
+    params, t_samples, _, _ = loss_args
+    rng = np.random.default_rng(0)
+    x_obs = rng.uniform(60, 110, n_obs)
+    y_obs = rng.uniform(45, 70, n_obs)
+    population = np.array([[25.0, 30.0], [0.01, -0.02], [50.0, 55.0]])
+    
+    l1, grad = l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    fused_l1, fused_grad = fused_l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    expected_vec = [l1_loss(member, t_samples, x_obs, y_obs) for member in population.T]
+    
+    assert np.isclose(fused_l1_loss(params, t_samples, x_obs, y_obs), l1)
+    assert np.isclose(fused_l1, l1)
+    assert np.allclose(fused_grad, grad)
+    assert np.allclose(fused_l1_loss_vec(population, t_samples, x_obs, y_obs), expected_vec)
+
+
+def test_l1_loss_and_grad_matches_finite_differences(loss_args):
+    """Test the analytical gradient against central finite differences."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    l1, grad = l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    
+    steps = np.array([1e-6, 1e-9, 1e-6])
+    numeric = np.array([
+        (l1_loss(params + h * e, t_samples, x_obs, y_obs)
+         - l1_loss(params - h * e, t_samples, x_obs, y_obs)) / (2 * h)
+        for h, e in zip(steps, np.eye(3))
+    ])
+    
+    assert np.isclose(l1, l1_loss(params, t_samples, x_obs, y_obs))
+    assert np.allclose(grad, numeric, rtol=1e-4)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba not installed")
+def test_fused_l1_loss_and_grad_matches_numpy(loss_args):
+    """Test that the Numba gradient kernel agrees with the NumPy gradient."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    l1, grad = l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    fused_l1, fused_grad = fused_l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    
+    assert np.isclose(fused_l1, l1)
+    assert np.allclose(fused_grad, grad)
+
+
+@pytest.mark.skipif(not AOT_AVAILABLE, reason="loss_aot extension not built")
+def test_aot_kernels_match_numpy(loss_args):
+    """Test that the ahead-of-time kernels agree with the NumPy loss."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    l1, grad = l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    aot_l1, aot_grad = fused_l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+    
+    assert np.isclose(aot_l1, l1)
+    assert np.allclose(aot_grad, grad)
+    assert np.allclose(fused_l1_loss_vec(params[:, None], t_samples, x_obs, y_obs), [l1])
+
+
+def test_nearest_curve_points_kdtree_matches_broadcast(sample_data, known_params):
+    """Test that the KD-tree and broadcast nearest-point paths agree."""
+    x_obs = sample_data['x'].to_numpy()
+    y_obs = sample_data['y'].to_numpy()
+    t_dense = get_uniform_t_values(KDTREE_MIN_PAIRS // len(x_obs) + 1)
+    x_pred, y_pred = predict(
+        t_dense, known_params['theta_deg'], known_params['M'], known_params['X']
+    )
+    
+    dist, nearest = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
+    
+    d2 = (x_pred[None, :] - x_obs[:, None])**2 + (y_pred[None, :] - y_obs[:, None])**2
+    assert np.array_equal(nearest, d2.argmin(axis=1))
+    assert np.allclose(dist, np.sqrt(d2.min(axis=1)))
+
+
+def test_loss_eval_matches_l1_loss_and_grad(loss_args):
+    """Test that repeated LossEval calls match the stateless loss and gradient."""
+    _, t_samples, x_obs, y_obs = loss_args
+    loss_eval = LossEval(t_samples, x_obs, y_obs)
+    
+    for theta_deg, M, X in [(25.0, 0.01, 50.0), (30.0, 0.01, 55.0), (30.0, -0.02, 55.0)]:
+        params = np.array([theta_deg, M, X])
+        l1, grad = loss_eval(params)
+        expected_l1, expected_grad = l1_loss_and_grad(params, t_samples, x_obs, y_obs)
+        assert np.isclose(l1, expected_l1)
+        assert np.allclose(grad, expected_grad)
+
+
+def test_loss_eval_pickle_round_trip(loss_args):
+    """Test that a pickled LossEval, as sent to restart workers, gives the same result."""
+    params, t_samples, x_obs, y_obs = loss_args
+    loss_eval = LossEval(t_samples, x_obs, y_obs)
+    
+    restored = pickle.loads(pickle.dumps(loss_eval))
+    l1, grad = restored(params)
+    expected_l1, expected_grad = loss_eval(params)
+    
+    assert np.isclose(l1, expected_l1)
+    assert np.allclose(grad, expected_grad)
+
+
+@pytest.mark.parametrize("n_samples", [20, KDTREE_MIN_PAIRS // 50 + 1])
+def test_l1_loss_vec_matches_per_member(sample_data, n_samples):
+    """Test population loss against per-member evaluation on both code paths."""
+    t_samples = get_uniform_t_values(n_samples)
+    x_obs = sample_data['x'].to_numpy()
+    y_obs = sample_data['y'].to_numpy()
+    population = np.array([
+        [25.0, 30.0, 10.0, 45.0],
+        [0.01, 0.03, -0.02, 0.0],
+        [50.0, 55.0, 20.0, 80.0]
+    ])
+    
+    expected = [l1_loss(member, t_samples, x_obs, y_obs) for member in population.T]
+    
+    assert np.allclose(l1_loss_vec(population, t_samples, x_obs, y_obs), expected)
+    if NUMBA_AVAILABLE:
+        assert np.allclose(fused_l1_loss_vec(population, t_samples, x_obs, y_obs), expected)
+
+
+def test_compute_residuals():
+    """Test pointwise residual distances, including large coordinates."""
+    x_pred = np.array([3.0, 0.0, 1e200])
+    y_pred = np.array([4.0, 0.0, 1e200])
+    x_obs = np.zeros(3)
+    y_obs = np.zeros(3)
+    
+    residuals = compute_residuals(x_pred, y_pred, x_obs, y_obs)
+    
+    assert np.allclose(residuals, [5.0, 0.0, np.sqrt(2) * 1e200])
@@ -82,3 +82,63 @@ def test_predict_M_zero():
     
     assert np.all(np.isfinite(x))
     assert np.all(np.isfinite(y))
+
+
+def test_predict_precomputed_terms():
+    """Test predict with precomputed t-dependent terms matches direct evaluation."""
+    t = np.array([6.0, 20.0, 45.0, 60.0])
+    theta_deg = 30.0
+    M = 0.03
+    X = 55.0
+    
+    x, y = predict(t, theta_deg, M, X)
+    x_cached, y_cached = predict(
+        t, theta_deg, M, X,
+        sin03t=np.sin(0.3 * t),
+        exp_term=np.exp(M * np.abs(t))
+    )
+    
+    assert np.allclose(x, x_cached)
+    assert np.allclose(y, y_cached)
+
+
+def test_predict_out_buffer():
+    """Test that predict writes into a provided buffer."""
+    t = np.linspace(6.0, 60.0, 20)
+    out = np.empty((2, len(t)))
+    scratch = np.empty(len(t))
+    
+    x, y = predict(t, 30.0, 0.03, 55.0)
+    x_buf, y_buf = predict(t, 30.0, 0.03, 55.0, out=out, scratch=scratch)
+    
+    assert np.shares_memory(x_buf, out)
+    assert np.shares_memory(y_buf, out)
+    assert np.allclose(out[0], x)
+    assert np.allclose(out[1], y)
+
+
+def test_predict_scalar_t():
+    """Test predict with scalar t returns scalars matching the array result."""
+    x, y = predict(10.0, 30.0, 0.03, 55.0)
+    x_arr, y_arr = predict(np.array([10.0]), 30.0, 0.03, 55.0)
+    
+    assert np.ndim(x) == 0
+    assert np.ndim(y) == 0
+    assert np.isclose(x, x_arr[0])
+    assert np.isclose(y, y_arr[0])
+
+
+def test_predict_broadcasts_parameter_arrays():
+    """Test predict with parameter arrays broadcasting against t."""
+    t = np.array([6.0, 20.0, 45.0])
+    theta_deg = np.array([[25.0], [30.0]])
+    M = np.array([[0.01], [0.03]])
+    X = np.array([[50.0], [55.0]])
+    
+    x, y = predict(t, theta_deg, M, X)
+    
+    assert x.shape == (2, 3)
+    for j in range(2):
+        x_j, y_j = predict(t, theta_deg[j, 0], M[j, 0], X[j, 0])
+        assert np.allclose(x[j], x_j)
+        assert np.allclose(y[j], y_j)
@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from model import predict
+import optimizer
 from optimizer import fit_params
 from data_loader import get_uniform_t_values
 
@@ -69,3 +70,77 @@ def test_optimizer_convergence(sample_data):
     # Check that L1 is finite and positive
     assert np.isfinite(result['l1'])
     assert result['l1'] > 0
+
+
+def test_optimizer_trf_local_method(known_params):
+    """Test optimizer with least-squares restarts on synthetic data."""
+    t_true = get_uniform_t_values(100)
+    x_true, y_true = predict(
+        t_true,
+        known_params['theta_deg'],
+        known_params['M'],
+        known_params['X']
+    )
+    df = pd.DataFrame({'x': x_true, 'y': y_true})
+    
+    result = fit_params(df, n_samples=50, n_restarts=3, seed=42, local_method='trf')
+    
+    assert abs(result['theta_deg'] - known_params['theta_deg']) < 5.0
+    assert abs(result['X'] - known_params['X']) < 10.0
+    assert result['l1'] < 5.0
+
+
+def test_optimizer_rejects_unknown_local_method(sample_data):
+    """Test that an unsupported local method raises ValueError."""
+    with pytest.raises(ValueError):
+        fit_params(sample_data, local_method='BFGS')
+
+
+def test_optimizer_parallel_restarts_match_serial(sample_data):
+    """Test that restarts run in a process pool reach the same fit as serial restarts."""
+    serial = fit_params(sample_data, n_samples=30, n_restarts=3, seed=42, n_jobs=1)
+    parallel = fit_params(sample_data, n_samples=30, n_restarts=3, seed=42, n_jobs=2)
+    
+    for key in ('theta_deg', 'M', 'X', 'l1'):
+        assert np.isclose(parallel[key], serial[key])
+
+
+def test_optimizer_float32_matches_float64(sample_data):
+    """Test that float32 distance evaluation reaches the same fit."""
+    result64 = fit_params(sample_data, n_samples=30, n_restarts=3, seed=42)
+    result32 = fit_params(sample_data, n_samples=30, n_restarts=3, seed=42, float32=True)
+    
+    assert abs(result32['l1'] - result64['l1']) < 1e-3
+
+
+def test_optimizer_float32_ignored_without_numba(sample_data, monkeypatch, caplog):
+    """Test that float32 falls back to float64 with a warning when Numba is missing."""
+    monkeypatch.setattr(optimizer, 'JIT_AVAILABLE', False)
+    
+    with caplog.at_level('WARNING', logger='optimizer'):
+        result = fit_params(sample_data, n_samples=30, n_restarts=3, seed=42, float32=True)
+    
+    assert "float32 requires Numba" in caplog.text
+    assert np.isfinite(result['l1'])
+
+
+def test_optimizer_skips_de_on_close_fit(known_params, caplog):
+    """Test that differential evolution is skipped unless forced when restarts fit closely."""
+    t_true = get_uniform_t_values(100)
+    x_true, y_true = predict(
+        t_true,
+        known_params['theta_deg'],
+        known_params['M'],
+        known_params['X']
+    )
+    df = pd.DataFrame({'x': x_true, 'y': y_true})
+    
+    with caplog.at_level('INFO', logger='optimizer'):
+        result = fit_params(df, n_samples=100, n_restarts=3, seed=42)
+    assert "Skipping differential evolution" in caplog.text
+    assert result['l1'] < 1e-3
+    
+    caplog.clear()
+    with caplog.at_level('INFO', logger='optimizer'):
+        fit_params(df, n_samples=100, n_restarts=3, seed=42, force_de=True)
+    assert "Running differential evolution" in caplog.text
@@ -0,0 +1,36 @@
+"""
+Unit tests for plotting utilities.
+"""
+
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from plotting import plot_residuals, sample_curve
+from loss import l1_loss, nearest_curve_points
+from data_loader import XY
+
+
+def test_residuals_mean_matches_l1_loss(loss_args, known_params):
+    """Test that residuals on a curve sampled at the fit's t samples average to the L1 loss."""
+    params, t_samples, x_obs, y_obs = loss_args
+    
+    x_pred, y_pred = sample_curve(known_params, len(t_samples))
+    residuals, _ = nearest_curve_points(x_pred, y_pred, x_obs, y_obs)
+    
+    expected = l1_loss(params, t_samples, x_obs, y_obs)
+    assert np.isclose(residuals.mean(), expected)
+
+
+def test_plot_residuals_saves_figure(temp_dir, sample_data, known_params):
+    """Test that plot_residuals writes the figure to the requested path."""
+    xy = XY(sample_data['x'].to_numpy(), sample_data['y'].to_numpy())
+    output_path = temp_dir / 'residuals.png'
+    
+    plot_residuals(xy, known_params, n_samples=80, output_path=str(output_path),
+                   curve=sample_curve(known_params, 80))
+    
+    assert output_path.exists()